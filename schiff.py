@@ -1,7 +1,64 @@
+import functools as _functools
+import hashlib as _hashlib
+import math as _math
+import os as _os
+import warnings as _warnings
+
 import numpy as _np
 import scipy.constants as _c
 
 
+def _kernels_source_hash():
+    """Hash of the schiff_native sources, to check that schiff_native is up to date.
+
+    schiff_native is built from schiff_kernels.py and the exports in
+    schiff_aot.py.  The physical constants are not compiled in, they are
+    passed on each call (see _KERNEL_CONSTANTS), so these two files are
+    all the extension depends on.
+
+    Returns:
+        int, the first 60 bits of the SHA-256 of the files
+    """
+    sha256 = _hashlib.sha256()
+    for file_name in ("schiff_kernels.py", "schiff_aot.py"):
+        path = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), file_name)
+        with open(path, "rb") as f:
+            sha256.update(f.read())
+    return int(sha256.hexdigest()[:15], 16)
+
+
+try:  # ahead-of-time compiled kernels, built with schiff_aot.py
+    import schiff_native as _native
+except ImportError:
+    _native = None
+
+if _native is not None and _native.kernels_source_hash() != _kernels_source_hash():
+    _warnings.warn(
+        "schiff_native was built from a different schiff_kernels.py or schiff_aot.py "
+        "and is ignored, rebuild it with `python schiff_aot.py`."
+    )
+    _native = None
+
+# Physical constants as plain floats, see also _KERNEL_CONSTANTS.
+_HBAR = _c.hbar
+_E = _c.e
+_EPSILON_0 = _c.epsilon_0
+_BOHR_RADIUS = _c.physical_constants["Bohr radius"][0]  # m
+
+# Atomic unit to SI conversions of Molecule.schiff_SI and Molecule.W_S_SI.
+_SCHIFF_AU_TO_SI = _E * 1e-45  # e fm^3 to C m^3
+_W_S_AU_TO_SI = _E / (4.0 * _math.pi * _EPSILON_0 * _BOHR_RADIUS**4.0)
+
+# g_1 to d_u - d_d conversion in cm^-1, see
+# up_down_quark_difference_chromo_EDM_sensitivity.
+_QUARK_CHROMO_FACTOR = 2e14
+
+# Unit chain of chromo_EDM_limits_on_new_particle_mass folded into a single
+# constant: alpha = 1/137, m_q = 5 MeV (very approximate up quark mass),
+# 1 cm = 1e13 fm, hbar * c = 197 MeV fm and 1 MeV = 1e-6 TeV.
+_MASS_LIMIT_CONST = 1e-6 * _math.sqrt((1 / 137) * 5 / _math.pi * 197 / 1e13)
+
+
 class MeasurementSettings:
     """Settings to determine a frequency measurement's sensitivity.
 
@@ -11,6 +68,9 @@ class MeasurementSettings:
     as an experimental efficiency factor (efficiency) which defines the contrast
     (i.e., how high the Rabi/Ramsey peak is).
 
+    The attributes may be arrays, the sensitivity functions then return
+    arrays broadcast over them (see also sensitivity_grid).
+
     Attributes:
         particle_number: uncorrelated particles per measurement (1)
         efficiency: experiment efficiency factor (0.99)
@@ -34,6 +94,28 @@ class MeasurementSettings:
         self.coherence_time = coherence_time
 
 
+@_functools.lru_cache(maxsize=None)
+def _compiled_kernel(kernel_name):
+    """Returns a compiled kernel taking scalar arguments.
+
+    Uses the ahead-of-time compiled kernel from schiff_native if it is built.
+    Otherwise schiff_kernels, and with it numba, is imported on first use.
+    The lookup is cached, it sits on the path of every sensitivity call.
+
+    Args:
+        kernel_name: str, name of the kernel, e.g. "sensitivity_kernel"
+
+    Returns:
+        kernel function, the compiled kernels raise TypeError for arrays
+    """
+    kernel = getattr(_native, kernel_name, None)
+    if kernel is None:
+        import schiff_kernels
+
+        kernel = getattr(schiff_kernels, kernel_name)
+    return kernel
+
+
 def frequency_sensitivity_Hz(measurement_settings):
     """Returns the frequency sensitivity of a measurement in Hertz.
 
@@ -43,19 +125,18 @@ def frequency_sensitivity_Hz(measurement_settings):
         measurement_settings: MeasurementSettings instance
 
     Returns:
-        float, measurement frequency sensitivity in Hz.
+        float or array of floats, measurement frequency sensitivity in Hz.
     """
     ms = measurement_settings
-    T_total = ms.measurement_time
-    T_down = ms.down_time
-    tau = ms.coherence_time
-    beta = ms.efficiency
-    N = ms.particle_number
-    prefactor = 2 * _np.pi * tau * beta
+    args = (ms.particle_number, ms.efficiency, ms.measurement_time, ms.down_time, ms.coherence_time)
+    try:
+        return _compiled_kernel("frequency_sensitivity_kernel")(*args)
+    except TypeError:  # array settings
+        import schiff_kernels
 
-    denominator = prefactor * _np.sqrt(N * T_total / (tau + T_down))
-
-    return 1 / denominator
+        # The plain Python kernel broadcasts over arrays.
+        kernel = schiff_kernels.frequency_sensitivity_kernel
+        return getattr(kernel, "py_func", kernel)(*args)
 
 
 class Molecule:
@@ -69,6 +150,8 @@ class Molecule:
     The nucleus_E_field_alignment factor is likely correct for RaSH+ and RaOCH3+,
     but thought needs to be given for other molecules, e.g. RaOH+.
 
+    As for MeasurementSettings, the attributes may be arrays.
+
     Attributes:
         W_S: molecular enhancment factor in atomic units (45000)
         K_S: Schiff moment/theta enhancement factor given in units of e fm^3 (1.0)
@@ -100,11 +183,9 @@ class Molecule:
         for more information.
 
         Returns:
-            float, Schiff moment in SI units.
+            float or array of floats, Schiff moment in SI units.
         """
-        fm = 1e-15  # m
-        Schiff_au_to_SI = _c.e * fm**3.0
-        return Schiff_au_to_SI * self.K_S
+        return _SCHIFF_AU_TO_SI * self.K_S
 
     @property
     def W_S_SI(self):
@@ -116,12 +197,9 @@ class Molecule:
         W_S is J/(C*m^3). See schiff_SI's docstring for further discussion.
 
         Returns:
-            float, molecular enhancement in SI units.
+            float or array of floats, molecular enhancement in SI units.
         """
-        bohr_radius = _c.physical_constants["Bohr radius"][0]  # m
-        electric_const = 4.0 * _np.pi * _c.epsilon_0
-        W_S_au_to_SI = _c.e / (electric_const * bohr_radius**4.0)
-        return W_S_au_to_SI * self.W_S
+        return _W_S_AU_TO_SI * self.W_S
 
 
 def theta_QCD_sensitivity(measurement_settings, molecule):
@@ -138,18 +216,9 @@ def theta_QCD_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, theta_QCD sensitivity (a unitless value)
+        float or array of floats, theta_QCD sensitivity (a unitless value)
     """
-    delta_omega = 2 * _np.pi * frequency_sensitivity_Hz(measurement_settings)
-    S = molecule.schiff_SI
-    W_S = molecule.W_S_SI
-
-    # The factor of 2 below comes from using two states with opposite
-    # Schiff sensitivity.
-    opposite_state_enhancement = 2
-    orientation_enhancement = 1.0 / (opposite_state_enhancement * molecule.nucleus_E_field_alignment)
-
-    return orientation_enhancement * _c.hbar * delta_omega / (W_S * S)
+    return _sensitivities(measurement_settings, molecule)[1]
 
 
 def schiff_moment_sensitivity(measurement_settings, molecule):
@@ -164,11 +233,9 @@ def schiff_moment_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, limit on the absolute value of the Schiff moment (e * fm**3)
+        float or array of floats, limit on the absolute value of the Schiff moment (e * fm**3)
     """
-    theta_limit = theta_QCD_sensitivity(measurement_settings, molecule)
-
-    return molecule.K_S * theta_limit
+    return _sensitivities(measurement_settings, molecule)[2]
 
 
 def _g_pi_NN_to_Schiff_prefactor():
@@ -197,6 +264,65 @@ def _g_pi_NN_to_Schiff_prefactor():
     return 2.0 * m_N * g_A / F_pi
 
 
+_G_PI_NN_TO_SCHIFF = _g_pi_NN_to_Schiff_prefactor()
+
+# Trailing arguments of the schiff_kernels sensitivity kernels.  They are passed
+# at call time rather than compiled in, so that neither numba's cache nor
+# schiff_native can hold on to outdated values.
+_KERNEL_CONSTANTS = (_HBAR, _SCHIFF_AU_TO_SI, _W_S_AU_TO_SI, _G_PI_NN_TO_SCHIFF)
+
+
+def _sensitivities(measurement_settings, molecule):
+    """Evaluates schiff_kernels.sensitivity_kernel for a measurement and molecule.
+
+    Args:
+        measurement_settings: MeasurementSettings instance
+        molecule: Molecule instance
+
+    Returns:
+        tuple of floats or arrays, see schiff_kernels.sensitivity_kernel
+    """
+    ms = measurement_settings
+    args = (
+        ms.particle_number,
+        ms.efficiency,
+        ms.measurement_time,
+        ms.down_time,
+        ms.coherence_time,
+        molecule.W_S,
+        molecule.K_S,
+        molecule.a_0,
+        molecule.a_1,
+        molecule.a_2,
+        molecule.nucleus_E_field_alignment,
+    )
+    try:
+        return _compiled_kernel("sensitivity_kernel")(*args, *_KERNEL_CONSTANTS)
+    except TypeError:  # array settings or molecule attributes
+        return _sensitivity_arrays(*args)
+
+
+def _sensitivity_arrays(*args):
+    """Evaluates schiff_kernels.sensitivity_grid_kernel on broadcast arguments.
+
+    Args:
+        *args: floats or arrays, the arguments of schiff_kernels.sensitivity_kernel
+
+    Returns:
+        tuple of arrays with the broadcast shape of args, in the order
+        returned by schiff_kernels.sensitivity_kernel
+    """
+    import schiff_kernels
+
+    args = _np.broadcast_arrays(*args)
+    shape = args[0].shape
+    flat_args = [_np.ascontiguousarray(arg, dtype=_np.float64).ravel() for arg in args]
+
+    out = _np.empty((7, flat_args[0].size))
+    schiff_kernels.sensitivity_grid_kernel(*flat_args, *_KERNEL_CONSTANTS, out)
+    return tuple(out.reshape((7,) + shape))
+
+
 def g_0_sensitivity(measurement_settings, molecule):
     """A measurement's sensitivity to g_0.
 
@@ -207,11 +333,9 @@ def g_0_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, g_0 sensitivity (a unitless value)
+        float or array of floats, g_0 sensitivity (a unitless value)
     """
-    schiff_limit = schiff_moment_sensitivity(measurement_settings, molecule)
-    prefactor = _g_pi_NN_to_Schiff_prefactor()
-    return _np.abs(schiff_limit / (prefactor * molecule.a_0))
+    return _sensitivities(measurement_settings, molecule)[3]
 
 
 def g_1_sensitivity(measurement_settings, molecule):
@@ -224,11 +348,9 @@ def g_1_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, g_1 sensitivity (a unitless value)
+        float or array of floats, g_1 sensitivity (a unitless value)
     """
-    schiff_limit = schiff_moment_sensitivity(measurement_settings, molecule)
-    prefactor = _g_pi_NN_to_Schiff_prefactor()
-    return schiff_limit / (prefactor * molecule.a_1)
+    return _sensitivities(measurement_settings, molecule)[4]
 
 
 def g_2_sensitivity(measurement_settings, molecule):
@@ -241,11 +363,9 @@ def g_2_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, g_2 sensitivity (a unitless value)
+        float or array of floats, g_2 sensitivity (a unitless value)
     """
-    schiff_limit = schiff_moment_sensitivity(measurement_settings, molecule)
-    prefactor = _g_pi_NN_to_Schiff_prefactor()
-    return _np.abs(schiff_limit / (prefactor * molecule.a_2))
+    return _sensitivities(measurement_settings, molecule)[5]
 
 
 def up_down_quark_difference_chromo_EDM_sensitivity(measurement_settings, molecule):
@@ -261,11 +381,10 @@ def up_down_quark_difference_chromo_EDM_sensitivity(measurement_settings, molecu
         molecule: Molecule instance
 
     Returns:
-        float, d_u - d_d quark chromo EDM sensitivity (units of cm^-1)
+        float or array of floats, d_u - d_d quark chromo EDM sensitivity (units of cm^-1)
     """
-    quark_chromo_factor = 2e14
     g_1_limit = g_1_sensitivity(measurement_settings, molecule)
-    d_u_minus_d_d = g_1_limit / quark_chromo_factor
+    d_u_minus_d_d = g_1_limit / _QUARK_CHROMO_FACTOR
     return d_u_minus_d_d
 
 
@@ -279,10 +398,65 @@ def radium_225_EDM_sensitivity(measurement_settings, molecule):
         molecule: Molecule instance
 
     Returns:
-        float, radium-225 EDM sensitivity (units of e*cm)
+        float or array of floats, radium-225 EDM sensitivity (units of e*cm)
     """
-    schiff_limit = schiff_moment_sensitivity(measurement_settings, molecule)
-    return _np.abs(-8.5e-17 * schiff_limit)
+    return _sensitivities(measurement_settings, molecule)[6]
+
+
+def sensitivity_grid(
+    molecule,
+    particle_number=1,
+    efficiency=0.99,
+    measurement_time=864000,
+    down_time=30e-3,
+    coherence_time=100,
+):
+    """Sensitivities of a molecule measurement over a grid of settings.
+
+    The measurement settings take the place of the MeasurementSettings
+    attributes (with the same defaults) and may be arrays; they are broadcast
+    against each other, and against array valued molecule attributes, and are
+    evaluated in a parallel compiled loop, e.g. pass particle_number[:, None] and
+    coherence_time[None, :] for a 2D scan.
+
+    Args:
+        molecule: Molecule instance
+        particle_number: uncorrelated particles per measurement
+        efficiency: experiment efficiency factor
+        measurement_time: total measurement time in seconds
+        down_time: dead time per measurement in seconds
+        coherence_time: spin precession time in seconds
+
+    Returns:
+        dict of arrays with the broadcast shape of the settings, with keys
+        "frequency_Hz", "theta_QCD", "schiff_moment", "g_0", "g_1", "g_2",
+        "up_down_quark_difference_chromo_EDM" and "radium_225_EDM" matching
+        the single point functions, e.g. g_1_sensitivity.
+    """
+    out = _sensitivity_arrays(
+        particle_number,
+        efficiency,
+        measurement_time,
+        down_time,
+        coherence_time,
+        molecule.W_S,
+        molecule.K_S,
+        molecule.a_0,
+        molecule.a_1,
+        molecule.a_2,
+        molecule.nucleus_E_field_alignment,
+    )
+
+    return {
+        "frequency_Hz": out[0],
+        "theta_QCD": out[1],
+        "schiff_moment": out[2],
+        "g_0": out[3],
+        "g_1": out[4],
+        "g_2": out[5],
+        "up_down_quark_difference_chromo_EDM": out[4] / _QUARK_CHROMO_FACTOR,
+        "radium_225_EDM": out[6],
+    }
 
 
 def chromo_EDM_limits_on_new_particle_mass(d_q=1e-27):
@@ -299,23 +473,20 @@ def chromo_EDM_limits_on_new_particle_mass(d_q=1e-27):
     10^-14 fm = 10^-14 fm/(hbar c) = 10^-14 fm/(197 MeV fm)
     = 10^-14/(197) MeV^-1
 
+    All of the conversion factors are collected in _MASS_LIMIT_CONST.
+
+    As with NumPy, d_q = 0 gives inf and a negative d_q gives nan, for
+    scalars and arrays alike.
+
     Args:
-        d_q: float, quark chromo EDM limit in cm.
+        d_q: float or array of floats, quark chromo EDM limit in cm.
 
     Returns:
-        float, particle mass sensitivity scale in TeV.
+        float or array of floats, particle mass sensitivity scale in TeV.
     """
-    alpha = 1 / 137  # fine structure constant
-    m_q = 5  # MeV - very approximate up quark mass
-
-    prefactor = alpha * m_q / _np.pi
-
-    cm_to_fm = 10**15 / 10**2
-    d_q_fm = d_q * cm_to_fm
-
-    fm_to_inv_MeV = 1 / 197
-    d_q_inv_MeV = d_q_fm * fm_to_inv_MeV
-
-    MeV_to_TeV = (1.0 / 1e-6) * (1e-12 / 1.0)
-
-    return MeV_to_TeV * _np.sqrt(prefactor * 1 / d_q_inv_MeV)
+    if isinstance(d_q, float) and d_q > 0.0:
+        # Fast path for the common scalar case, math.sqrt skips the ufunc
+        # dispatch.  Everything else goes through NumPy, for broadcasting and
+        # for its inf / nan results.
+        return _MASS_LIMIT_CONST / _math.sqrt(d_q)
+    return _MASS_LIMIT_CONST / _np.sqrt(d_q)
@@ -0,0 +1,83 @@
+"""Ahead-of-time compilation of the schiff.py sensitivity kernels.
+
+numba compiles the kernels in schiff_kernels.py on their first call, or loads
+them from its on-disk cache.  For short scripts that only evaluate a
+few sensitivities this can dominate the run time.  Running
+
+    python schiff_aot.py
+
+builds the schiff_native extension module next to this file, which
+schiff.py then uses for the single point sensitivity functions.  The
+extension records a hash of schiff_kernels.py and this file; after either
+changes, schiff.py ignores it (with a warning) until it is rebuilt.  The
+physical constants are arguments of the kernels, so changing them in
+schiff.py needs no rebuild.
+
+numba.pycc is pending deprecation, importing it emits a
+NumbaPendingDeprecationWarning as of numba 0.68.
+"""
+import os
+
+from numba.pycc import CC
+
+import schiff as _schiff
+import schiff_kernels as _kernels
+
+_KERNELS_SOURCE_HASH = _schiff._kernels_source_hash()
+
+cc = CC("schiff_native")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export("kernels_source_hash", "i8()")
+def kernels_source_hash():
+    return _KERNELS_SOURCE_HASH
+
+
+@cc.export("frequency_sensitivity_kernel", "f8(f8, f8, f8, f8, f8)")
+def frequency_sensitivity_kernel(N, beta, T_total, T_down, tau):
+    return _kernels.frequency_sensitivity_kernel(N, beta, T_total, T_down, tau)
+
+
+@cc.export(
+    "sensitivity_kernel",
+    "UniTuple(f8, 7)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)",
+)
+def sensitivity_kernel(
+    N,
+    beta,
+    T_total,
+    T_down,
+    tau,
+    W_S,
+    K_S,
+    a_0,
+    a_1,
+    a_2,
+    alignment,
+    hbar,
+    schiff_au_to_SI,
+    W_S_au_to_SI,
+    g_pi_NN_to_schiff,
+):
+    return _kernels.sensitivity_kernel(
+        N,
+        beta,
+        T_total,
+        T_down,
+        tau,
+        W_S,
+        K_S,
+        a_0,
+        a_1,
+        a_2,
+        alignment,
+        hbar,
+        schiff_au_to_SI,
+        W_S_au_to_SI,
+        g_pi_NN_to_schiff,
+    )
+
+
+if __name__ == "__main__":
+    cc.compile()
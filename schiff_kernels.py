@@ -0,0 +1,154 @@
+"""Compiled kernels behind the schiff.py sensitivity functions.
+
+schiff.py imports this module on the first sensitivity evaluation, so
+that `import schiff` does not pay for importing numba.  numba is
+optional, without it the kernels run as plain Python.
+
+The scalar kernels are compiled eagerly for float64 arguments, ints are
+converted on the call and arrays are rejected with a TypeError.  Arrays go
+through sensitivity_grid_kernel instead, except for
+frequency_sensitivity_kernel whose plain Python version (its py_func
+attribute) broadcasts with NumPy.
+
+The physical constants are arguments, see schiff._KERNEL_CONSTANTS.
+numba's cache is only invalidated when this file changes, so constants
+read from schiff.py as globals would stay frozen in the cached code.
+"""
+import numpy as _np
+
+try:
+    from numba import njit as _njit
+    from numba import prange as _prange
+except ImportError:  # numba is optional, the kernels then run as plain Python.
+    _prange = range
+
+    def _njit(*args, **kwargs):
+        return lambda func: func
+
+
+# A zero Molecule coefficient, e.g. a_0 = 0, makes only the matching g
+# sensitivity infinite, as with NumPy floats.  This needs NumPy's error model
+# (numba's default raises ZeroDivisionError) and fastmath without the flags
+# that assume no infs or nans ("ninf", "nnan").
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@_njit("f8(f8, f8, f8, f8, f8)", cache=True, fastmath=_FASTMATH, error_model="numpy")
+def frequency_sensitivity_kernel(N, beta, T_total, T_down, tau):
+    """Core of schiff.frequency_sensitivity_Hz, see its docstring."""
+    prefactor = 2 * _np.pi * tau * beta
+
+    denominator = prefactor * _np.sqrt(N * T_total / (tau + T_down))
+
+    return 1 / denominator
+
+
+@_njit(
+    "UniTuple(f8, 7)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)",
+    cache=True,
+    fastmath=_FASTMATH,
+    error_model="numpy",
+)
+def sensitivity_kernel(
+    N,
+    beta,
+    T_total,
+    T_down,
+    tau,
+    W_S,
+    K_S,
+    a_0,
+    a_1,
+    a_2,
+    alignment,
+    hbar,
+    schiff_au_to_SI,
+    W_S_au_to_SI,
+    g_pi_NN_to_schiff,
+):
+    """Sensitivity chain of a molecular Schiff moment measurement.
+
+    Evaluates everything from the frequency sensitivity to the radium-225 EDM
+    sensitivity in a single call.  The arguments are the MeasurementSettings
+    and Molecule attributes followed by schiff._KERNEL_CONSTANTS, see
+    schiff._sensitivities.
+
+    Returns:
+        tuple, (frequency sensitivity in Hz, theta_QCD, Schiff moment
+        in e fm^3, g_0, g_1, g_2, radium-225 EDM in e cm)
+    """
+    delta_f = frequency_sensitivity_kernel(N, beta, T_total, T_down, tau)
+    delta_omega = 2 * _np.pi * delta_f
+
+    # Molecule.schiff_SI and Molecule.W_S_SI
+    S_SI = schiff_au_to_SI * K_S
+    W_S_SI = W_S_au_to_SI * W_S
+
+    # The factor of 2 below comes from using two states with opposite
+    # Schiff sensitivity.
+    opposite_state_enhancement = 2
+    orientation_enhancement = 1.0 / (opposite_state_enhancement * alignment)
+
+    theta = orientation_enhancement * hbar * delta_omega / (W_S_SI * S_SI)
+    schiff = K_S * theta
+
+    g_0 = _np.abs(schiff / (g_pi_NN_to_schiff * a_0))
+    g_1 = schiff / (g_pi_NN_to_schiff * a_1)
+    g_2 = _np.abs(schiff / (g_pi_NN_to_schiff * a_2))
+
+    # Eq. 16 in Dzuba2002a
+    d_Ra = _np.abs(-8.5e-17 * schiff)
+
+    return delta_f, theta, schiff, g_0, g_1, g_2, d_Ra
+
+
+@_njit(cache=True, fastmath=_FASTMATH, error_model="numpy", parallel=True)
+def sensitivity_grid_kernel(
+    N,
+    beta,
+    T_total,
+    T_down,
+    tau,
+    W_S,
+    K_S,
+    a_0,
+    a_1,
+    a_2,
+    alignment,
+    hbar,
+    schiff_au_to_SI,
+    W_S_au_to_SI,
+    g_pi_NN_to_schiff,
+    out,
+):
+    """Evaluates sensitivity_kernel over 1D argument arrays, in parallel.
+
+    The measurement and molecule arguments are arrays of the same size, the
+    constants are floats.  Results are written to out, with shape
+    (7, N.size), in the order returned by sensitivity_kernel.
+    """
+    for i in _prange(N.size):
+        delta_f, theta, schiff, g_0, g_1, g_2, d_Ra = sensitivity_kernel(
+            N[i],
+            beta[i],
+            T_total[i],
+            T_down[i],
+            tau[i],
+            W_S[i],
+            K_S[i],
+            a_0[i],
+            a_1[i],
+            a_2[i],
+            alignment[i],
+            hbar,
+            schiff_au_to_SI,
+            W_S_au_to_SI,
+            g_pi_NN_to_schiff,
+        )
+        out[0, i] = delta_f
+        out[1, i] = theta
+        out[2, i] = schiff
+        out[3, i] = g_0
+        out[4, i] = g_1
+        out[5, i] = g_2
+        out[6, i] = d_Ra
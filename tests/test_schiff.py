@@ -1,3 +1,4 @@
+import numpy as _np
 import pytest
 
 import schiff as _schiff
@@ -91,3 +92,121 @@ def test_chromo_EDM_limits_on_new_particle_mass():
     out = _schiff.chromo_EDM_limits_on_new_particle_mass(d_q=1e-27)
 
     assert out == pytest.approx(15.1, rel=0, abs=1e-1)
+
+
+def test_sensitivity_grid(Schiff_Wrapper):
+    particle_number = _np.array([1, 10, 100])
+    coherence_time = _np.array([1.0, 10.0, 100.0, 1000.0])
+
+    out = _schiff.sensitivity_grid(
+        Schiff_Wrapper.molecule,
+        particle_number=particle_number[:, None],
+        coherence_time=coherence_time[None, :],
+    )
+
+    single_point = {
+        "frequency_Hz": lambda ms, molecule: _schiff.frequency_sensitivity_Hz(ms),
+        "theta_QCD": _schiff.theta_QCD_sensitivity,
+        "schiff_moment": _schiff.schiff_moment_sensitivity,
+        "g_0": _schiff.g_0_sensitivity,
+        "g_1": _schiff.g_1_sensitivity,
+        "g_2": _schiff.g_2_sensitivity,
+        "up_down_quark_difference_chromo_EDM": (
+            _schiff.up_down_quark_difference_chromo_EDM_sensitivity
+        ),
+        "radium_225_EDM": _schiff.radium_225_EDM_sensitivity,
+    }
+    assert out.keys() == single_point.keys()
+    for key, func in single_point.items():
+        assert out[key].shape == (3, 4)
+        for i, N in enumerate(particle_number):
+            for j, tau in enumerate(coherence_time):
+                ms = _schiff.MeasurementSettings(particle_number=N, coherence_time=tau)
+                expected = func(ms, Schiff_Wrapper.molecule)
+                assert out[key][i, j] == pytest.approx(expected, rel=1e-12), key
+
+
+def test_sensitivity_grid_zero_coefficients():
+    molecule = _schiff.Molecule(a_0=_np.array([0.0, -1.5]), a_2=_np.array([-4.0, 0.0]))
+
+    out = _schiff.sensitivity_grid(molecule, particle_number=_np.array([1, 100]))
+
+    assert out["g_0"][0] == _np.inf
+    assert out["g_2"][1] == _np.inf
+    assert out["g_0"][1] == pytest.approx(0.86e-13, rel=0, abs=1e-14)
+    assert out["g_2"][0] == pytest.approx(3.2e-13, rel=0, abs=1e-14)
+    assert out["g_1"] == pytest.approx([2.14e-13, 2.14e-14], rel=1e-2)
+
+
+def test_chromo_EDM_limits_on_new_particle_mass_array():
+    d_q = _np.array([1e-27, 4e-27])
+
+    out = _schiff.chromo_EDM_limits_on_new_particle_mass(d_q=d_q)
+
+    assert out == pytest.approx([15.1, 7.56], rel=0, abs=1e-1)
+
+
+def test_chromo_EDM_limits_on_new_particle_mass_edge_cases():
+    with _np.errstate(divide="ignore", invalid="ignore"):
+        for d_q in (0.0, 0, _np.float64(0.0), _np.array([0.0])):
+            assert _schiff.chromo_EDM_limits_on_new_particle_mass(d_q=d_q) == _np.inf
+        for d_q in (-1e-27, _np.float64(-1e-27), _np.array([-1e-27])):
+            assert _np.isnan(_schiff.chromo_EDM_limits_on_new_particle_mass(d_q=d_q))
+
+
+def test_array_settings(Schiff_Wrapper):
+    ms = _schiff.MeasurementSettings(particle_number=_np.array([1, 100]))
+    molecule = _schiff.Molecule(W_S=_np.array([45000, 90000]))
+
+    f = _schiff.frequency_sensitivity_Hz(ms)
+    theta = _schiff.theta_QCD_sensitivity(Schiff_Wrapper.ms, molecule)
+
+    assert f == pytest.approx([1.73e-5, 1.73e-6], rel=1e-2)
+    assert theta == pytest.approx([1.73e-11, 0.865e-11], rel=1e-2)
+
+
+def test_zero_coefficients(Schiff_Wrapper):
+    molecule = _schiff.Molecule(a_0=0.0, a_2=0)
+
+    theta = _schiff.theta_QCD_sensitivity(Schiff_Wrapper.ms, molecule)
+    g_0 = _schiff.g_0_sensitivity(Schiff_Wrapper.ms, molecule)
+    g_1 = _schiff.g_1_sensitivity(Schiff_Wrapper.ms, molecule)
+    g_2 = _schiff.g_2_sensitivity(Schiff_Wrapper.ms, molecule)
+
+    assert theta == pytest.approx(1.73e-11, rel=0, abs=1e-12)
+    assert g_1 == pytest.approx(2.1e-13, rel=0, abs=1e-14)
+    assert g_0 == _np.inf
+    assert g_2 == _np.inf
+
+
+def test_kernel_constants(Schiff_Wrapper, monkeypatch):
+    """The kernels take the constants at call time, they are not compiled in."""
+    hbar, schiff_au_to_SI, W_S_au_to_SI, g_pi_NN_to_schiff = _schiff._KERNEL_CONSTANTS
+    monkeypatch.setattr(
+        _schiff,
+        "_KERNEL_CONSTANTS",
+        (hbar, schiff_au_to_SI, W_S_au_to_SI, 2 * g_pi_NN_to_schiff),
+    )
+
+    out = _schiff.g_1_sensitivity(Schiff_Wrapper.ms, Schiff_Wrapper.molecule)
+
+    assert out == pytest.approx(1.05e-13, rel=0, abs=1e-14)
+
+
+@pytest.mark.skipif(_schiff._native is None, reason="schiff_native is not built")
+def test_native_kernels():
+    import schiff_kernels
+
+    settings = (9.0, 0.08, 1.13e6, 0.25, 0.7)
+    molecule = (45000.0, 1.0, -1.5, 6.0, -4.0, 0.25)
+
+    native_f = _schiff._native.frequency_sensitivity_kernel(*settings)
+    jit_f = schiff_kernels.frequency_sensitivity_kernel(*settings)
+    assert native_f == pytest.approx(jit_f, rel=1e-12)
+
+    # Doubled constants, to check that they are not compiled in.
+    for constants in (_schiff._KERNEL_CONSTANTS, tuple(2 * c for c in _schiff._KERNEL_CONSTANTS)):
+        args = settings + molecule + constants
+        native = _schiff._native.sensitivity_kernel(*args)
+        jit = schiff_kernels.sensitivity_kernel(*args)
+        assert native == pytest.approx(jit, rel=1e-12)